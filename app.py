@@ -1,5 +1,6 @@
 import os
 import datetime
+import click
 from flask import Flask, render_template, request, redirect, url_for, send_from_directory
 from flask_sqlalchemy import SQLAlchemy
 from werkzeug.utils import secure_filename
@@ -9,7 +10,8 @@ from werkzeug.utils import secure_filename
 from sqlalchemy.orm import relationship
 
 # --- Congiguration Imports ---
-from config import SQLALCHEMY_DATABASE_URI, UPLOAD_FOLDER, ALLOWED_EXTENSIONS
+from config import SQLALCHEMY_DATABASE_URI, UPLOAD_FOLDER, ALLOWED_EXTENSIONS, STORAGE_BACKEND, STORAGE_LOCAL_DIR
+from replication import ReplicationWorker, needs_replication, STATUS_INLINE, STATUS_PENDING
 
 # --- HEIC Opener Registration ---
 try:
@@ -33,6 +35,15 @@ class Media(db.Model):
     media_path = db.Column(db.String(200), nullable=False)
     is_video =  db.Column(db.Boolean, default=False)
 
+    # Cloud replication state (only set for videos and oversized images)
+    replication_status = db.Column(db.String(20), nullable=True) # see STATUS_* in replication.py (NULL = not yet classified)
+    storage_key = db.Column(db.String(200), nullable=True)
+    checksum_sha256 = db.Column(db.String(64), nullable=True)
+    replicated_at = db.Column(db.DateTime, nullable=True)
+    replication_started_at = db.Column(db.DateTime, nullable=True) # when a worker claimed the row
+    replication_attempts = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    replication_error = db.Column(db.String(500), nullable=True)
+
     def __repr__(self):
         return f'<Media {self.media_path}>'
 
@@ -51,6 +62,23 @@ class Entry(db.Model):
 with app.app_context():
     db.create_all()
 
+# --- Background Media Replication ---
+# Started on the first request (any WSGI host), not at import, so the weekly script doesn't spawn it.
+# The thread's startup sweep resumes rows left pending/failed by a previous run.
+replicator = ReplicationWorker(app, db, Media)
+
+@app.before_request
+def start_replicator():
+    replicator.start()
+
+@app.cli.command('replicate')
+def replicate_command():
+    """Replicate every pending/failed media file now (e.g. from cron when the web app is not running)."""
+    count = replicator.replicate_pending()
+    if replicator.backend_error:
+        raise click.ClickException(replicator.backend_error)
+    print(f"Processed {count} media file(s).")
+
 # --- Helper Functions ---
 
 def allowed_file(filename):
@@ -120,6 +148,12 @@ def process_and_save_media(photo_file):
 def uploaded_file(filename):
     return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
 
+if STORAGE_BACKEND == 'local':
+    @app.route('/storage/<filename>')
+    def stored_object(filename):
+        # HTTP stand-in for the 'local' storage backend's public URLs (other backends serve their own)
+        return send_from_directory(STORAGE_LOCAL_DIR, filename)
+
 @app.route('/')
 def index():
 # Fetch ALL entries from the database, ordered by date (latest first)
@@ -164,6 +198,14 @@ def new_entry():
             if media_path:
                 # Create a new Media object for each successful file
                 new_media = Media(media_path=media_path, is_video=is_video)
+
+                # Flag videos/large images for cloud replication once the entry is saved
+                local_path = os.path.join(app.config['UPLOAD_FOLDER'], media_path.split('/')[-1])
+                if needs_replication(local_path, is_video):
+                    new_media.replication_status = STATUS_PENDING
+                else:
+                    new_media.replication_status = STATUS_INLINE
+
                 media_items.append(new_media)
 
 
@@ -179,11 +221,16 @@ def new_entry():
             db.session.add(new_entry)
             # Media items are automatically added/persisted due to the relationship setup
             db.session.commit()
-            return redirect(url_for('entry_success'))
         except Exception as e:
             db.session.rollback()
             return f"Database error: {e}", 500
-        
+
+        # 7. Hand large files to the background replicator (doesn't block the response)
+        pending_ids = [m.id for m in media_items if m.replication_status == STATUS_PENDING]
+        if pending_ids:
+            replicator.enqueue(pending_ids)
+
+        return redirect(url_for('entry_success'))
 
     return render_template('new_entry.html')
 
@@ -8,11 +8,11 @@ BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 
 #SQLite Database Config
 # The database.db file will be created in the main project folder
-SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(BASE_DIR, 'database.db')
+SQLALCHEMY_DATABASE_URI = os.environ.get('SQLALCHEMY_DATABASE_URI', 'sqlite:///' + os.path.join(BASE_DIR, 'database.db'))
 
 # File uplaod Config
 # Images will be saved in the 'uploads' folder
-UPLOAD_FOLDER = os.path.join(BASE_DIR, 'uploads')
+UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER', os.path.join(BASE_DIR, 'uploads'))
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'heic', 'mp4', 'mov', 'webm'}
 
 
@@ -25,4 +25,18 @@ EMAIL_ADDRESS = os.environ.get('EMAIL_ADDRESS')
 EMAIL_PASSWORD = os.environ.get('EMAIL_PASSWORD')    
 RECIPIENT_EMAIL = os.environ.get('RECIPIENT_EMAIL')
 
-CLOUD_STORAGE_BASE_URL = os.environ.get('CLOUD_STORAGE_BASE_URL')
\ No newline at end of file
+# Media Replication Config
+# Videos and oversized images are copied to the storage backend in the background after upload.
+# 'local' is a directory-backed stand-in, served over HTTP by the app's /storage/<filename> route.
+# STORAGE_PUBLIC_BASE_URL must point at wherever the chosen backend actually stores files.
+STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'local')
+STORAGE_LOCAL_DIR = os.environ.get('STORAGE_LOCAL_DIR', os.path.join(BASE_DIR, 'storage'))
+STORAGE_PUBLIC_BASE_URL = os.environ.get('STORAGE_PUBLIC_BASE_URL', 'http://localhost:5001/storage/')
+REPLICATION_PART_SIZE_BYTES = int(os.environ.get('REPLICATION_PART_SIZE_BYTES', 8 * 1024 * 1024))
+REPLICATION_MAX_CONCURRENCY = int(os.environ.get('REPLICATION_MAX_CONCURRENCY', 4))
+REPLICATION_MAX_ATTEMPTS = int(os.environ.get('REPLICATION_MAX_ATTEMPTS', 3)) # upload attempts per sweep
+REPLICATION_ATTEMPT_LIMIT = int(os.environ.get('REPLICATION_ATTEMPT_LIMIT', 12)) # total attempts before a file is abandoned
+REPLICATION_RETRY_BACKOFF_SECONDS = float(os.environ.get('REPLICATION_RETRY_BACKOFF_SECONDS', 5)) # doubles after each failed attempt
+REPLICATION_SWEEP_INTERVAL_SECONDS = int(os.environ.get('REPLICATION_SWEEP_INTERVAL_SECONDS', 15 * 60)) # how often pending/failed rows are re-queued
+REPLICATION_STALE_UPLOAD_SECONDS = int(os.environ.get('REPLICATION_STALE_UPLOAD_SECONDS', 60 * 60)) # abandoned multipart uploads older than this are removed
+REPLICATION_CLAIM_TIMEOUT_SECONDS = int(os.environ.get('REPLICATION_CLAIM_TIMEOUT_SECONDS', 2 * 60 * 60)) # 'in_progress' rows older than this are assumed dead and retried
\ No newline at end of file
@@ -23,9 +23,10 @@ from config import (
     EMAIL_ADDRESS, 
     EMAIL_PASSWORD, 
     RECIPIENT_EMAIL,
-    MAX_INLINE_IMAGE_SIZE_BYTES,
-    CLOUD_STORAGE_BASE_URL
+    MAX_INLINE_IMAGE_SIZE_BYTES
 )
+from storage import get_storage_backend
+from replication import STATUS_REPLICATED
 
 # --- Configuration ---
 VIDEO_EXTENSIONS = ('.mp4', '.mov', '.webm') 
@@ -151,6 +152,37 @@ def send_email(subject, html_body, media_list):
                 pass
 
 
+def build_media_info(media_obj, storage_backend):
+    """Builds the template/attachment dictionary for one Media row."""
+    filename = media_obj.media_path.split('/')[-1]
+
+    # Use the 'is_video' property from the database
+    is_vid = media_obj.is_video
+    full_local_media_path = os.path.join(UPLOAD_FOLDER, filename)
+
+    # Determine if we should use an external link (for videos and oversized images)
+    is_external_link = is_vid or (os.path.exists(full_local_media_path) and os.path.getsize(full_local_media_path) > MAX_INLINE_IMAGE_SIZE_BYTES)
+
+    # Only link to objects the replicator has finished AND that are really in the store
+    external_url = None
+    if (is_external_link and storage_backend is not None
+            and media_obj.replication_status == STATUS_REPLICATED
+            and storage_backend.exists(media_obj.storage_key)):
+        external_url = storage_backend.public_url(media_obj.storage_key)
+    elif is_external_link:
+        print(f"No replicated copy of {filename} yet (status: {media_obj.replication_status}). Omitting link.")
+
+    return {
+        'is_video': is_vid,
+        'is_external_link': is_external_link, # New flag for the template
+        'local_media_path': full_local_media_path,
+        'media_filename': filename,
+        'external_url': external_url, # Used in HTML template (None until replicated)
+        'replication_status': media_obj.replication_status, # Lets the template tell 'syncing' from 'failed'
+        'replication_error': media_obj.replication_error
+    }
+
+
 # --- Main Summary Generation Logic (Modified to handle multiple media files) ---
 
 def generate_summary_and_send():
@@ -173,6 +205,13 @@ def generate_summary_and_send():
 
         print(f"\n--- Generating Weekly Summary ({start_date} to {end_date_incl}) ---")
         
+        # Large files are uploaded by the background replicator; here we only check what already exists
+        try:
+            storage_backend = get_storage_backend()
+        except Exception as e:
+            print(f"Storage backend unavailable ({e}). Large files will be listed without links.")
+            storage_backend = None
+
         summary_data = [] # List of dictionaries for the template
         media_list = []   # Flattened list of ALL media items for email attachment
         
@@ -181,23 +220,8 @@ def generate_summary_and_send():
             
             # 🚨 UPDATE: Loop through the media items attached to the entry
             for media_obj in entry.media:
-                filename = media_obj.media_path.split('/')[-1]
-                
-                # Use the 'is_video' property from the database
-                is_vid = media_obj.is_video 
-                full_local_media_path = os.path.join(UPLOAD_FOLDER, filename)
-                
-                # Determine if we should use an external link (for videos and oversized images)
-                is_external_link = is_vid or (os.path.exists(full_local_media_path) and os.path.getsize(full_local_media_path) > MAX_INLINE_IMAGE_SIZE_BYTES)
-
-                media_info = {
-                    'is_video': is_vid,
-                    'is_external_link': is_external_link, # New flag for the template
-                    'local_media_path': full_local_media_path,
-                    'media_filename': filename,
-                    'external_url': CLOUD_STORAGE_BASE_URL + filename # Used in HTML template
-                }
-                
+                media_info = build_media_info(media_obj, storage_backend)
+
                 # Add to the flattened list for email attachment processing
                 media_list.append(media_info)
                 
@@ -0,0 +1,40 @@
+"""Add media replication state
+
+Revision ID: b7c2e91d4f10
+Revises: 73a8d5ce1ef2
+Create Date: 2026-10-18 09:12:44.318205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7c2e91d4f10'
+down_revision: Union[str, Sequence[str], None] = '73a8d5ce1ef2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows are left NULL; the replication worker's sweep (or `flask --app app replicate`) marks each one
+    # 'inline' or 'pending' once.
+    with op.batch_alter_table('media', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('replication_status', sa.String(length=20), nullable=True))
+        batch_op.add_column(sa.Column('storage_key', sa.String(length=200), nullable=True))
+        batch_op.add_column(sa.Column('checksum_sha256', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('replicated_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('replication_error', sa.String(length=500), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('media', schema=None) as batch_op:
+        batch_op.drop_column('replication_error')
+        batch_op.drop_column('replicated_at')
+        batch_op.drop_column('checksum_sha256')
+        batch_op.drop_column('storage_key')
+        batch_op.drop_column('replication_status')
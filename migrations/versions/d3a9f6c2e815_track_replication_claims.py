@@ -0,0 +1,30 @@
+"""Track replication claims
+
+Revision ID: d3a9f6c2e815
+Revises: b7c2e91d4f10
+Create Date: 2026-10-19 10:04:21.556803
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3a9f6c2e815'
+down_revision: Union[str, Sequence[str], None] = 'b7c2e91d4f10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('media', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('replication_started_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('media', schema=None) as batch_op:
+        batch_op.drop_column('replication_started_at')
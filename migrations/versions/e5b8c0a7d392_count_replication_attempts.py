@@ -0,0 +1,30 @@
+"""Count replication attempts
+
+Revision ID: e5b8c0a7d392
+Revises: d3a9f6c2e815
+Create Date: 2026-10-19 11:37:50.104392
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b8c0a7d392'
+down_revision: Union[str, Sequence[str], None] = 'd3a9f6c2e815'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('media', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('replication_attempts', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('media', schema=None) as batch_op:
+        batch_op.drop_column('replication_attempts')
@@ -0,0 +1,301 @@
+import os
+import time
+import queue
+import datetime
+import threading
+
+from storage import get_storage_backend, upload_file
+from config import (
+    UPLOAD_FOLDER,
+    MAX_INLINE_IMAGE_SIZE_BYTES,
+    REPLICATION_MAX_ATTEMPTS,
+    REPLICATION_ATTEMPT_LIMIT,
+    REPLICATION_RETRY_BACKOFF_SECONDS,
+    REPLICATION_SWEEP_INTERVAL_SECONDS,
+    REPLICATION_STALE_UPLOAD_SECONDS,
+    REPLICATION_CLAIM_TIMEOUT_SECONDS
+)
+
+# --- Replication States (stored on Media.replication_status) ---
+# None only marks rows saved before replication existed; the sweep classifies them once.
+STATUS_INLINE = 'inline' # small enough to embed in the email, never replicated
+STATUS_PENDING = 'pending'
+STATUS_IN_PROGRESS = 'in_progress' # claimed by one worker (process, thread or `flask replicate`)
+STATUS_REPLICATED = 'replicated'
+STATUS_FAILED = 'failed' # retried by the next sweep
+STATUS_ABANDONED = 'abandoned' # gave up after REPLICATION_ATTEMPT_LIMIT attempts
+STATUS_MISSING = 'missing' # the uploaded file is gone from UPLOAD_FOLDER, nothing to copy
+
+# Rows a worker may claim with a conditional UPDATE
+CLAIMABLE_STATUSES = (STATUS_PENDING, STATUS_FAILED)
+
+
+def needs_replication(local_path, is_video):
+    """Videos and images too large to embed inline are linked from the cloud instead."""
+    if is_video:
+        return True
+    return os.path.exists(local_path) and os.path.getsize(local_path) > MAX_INLINE_IMAGE_SIZE_BYTES
+
+
+class ReplicationWorker:
+    """
+    Background thread that copies qualifying Media files to the storage backend.
+    Media IDs are queued right after an entry is committed, so uploads never
+    hold up the request (or the weekly email, which only reads the stored state).
+    On start, and then every REPLICATION_SWEEP_INTERVAL_SECONDS, the thread also
+    re-queues pending/failed rows and backfills media saved before replication existed.
+    Several workers may run at once (gunicorn processes, cron), so each row is
+    claimed in the database before it is uploaded.
+    """
+
+    def __init__(self, app, db, media_model, backend_factory=get_storage_backend,
+                 max_attempts=REPLICATION_MAX_ATTEMPTS,
+                 attempt_limit=REPLICATION_ATTEMPT_LIMIT,
+                 retry_backoff=REPLICATION_RETRY_BACKOFF_SECONDS,
+                 sweep_interval=REPLICATION_SWEEP_INTERVAL_SECONDS,
+                 claim_timeout=REPLICATION_CLAIM_TIMEOUT_SECONDS):
+        self.app = app
+        self.db = db
+        self.media_model = media_model
+        self.backend_factory = backend_factory
+        self.max_attempts = max_attempts
+        self.attempt_limit = attempt_limit
+        self.retry_backoff = retry_backoff
+        self.sweep_interval = sweep_interval
+        self.claim_timeout = claim_timeout
+        self._backend = None
+        self.backend_error = None # why the backend couldn't be built (e.g. a typo in STORAGE_BACKEND)
+        self._queue = queue.Queue()
+        self._queued_ids = set() # IDs waiting in the queue, so sweeps don't add duplicates
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = self.backend_factory()
+        return self._backend
+
+    def get_backend(self):
+        """
+        Returns the storage backend, or None if it can't be built. The error is kept in
+        backend_error and written onto every waiting row, so the dashboard/digest can show it.
+        """
+        try:
+            backend = self.backend
+        except Exception as e:
+            self.backend_error = f"Storage backend unavailable: {e}"
+            print(self.backend_error)
+            Media = self.media_model
+            with self.app.app_context():
+                self.db.session.execute(
+                    self.db.update(Media)
+                    .where(Media.replication_status.in_(CLAIMABLE_STATUSES))
+                    .values(replication_error=self.backend_error[:500])
+                )
+                self.db.session.commit()
+            return None
+        self.backend_error = None
+        return backend
+
+    def start(self):
+        """Starts the worker thread (once). Safe to call on every request."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='media-replication', daemon=True)
+                self._thread.start()
+
+    def enqueue(self, media_ids):
+        self.start()
+        with self._lock:
+            for media_id in media_ids:
+                if media_id not in self._queued_ids:
+                    self._queued_ids.add(media_id)
+                    self._queue.put(media_id)
+
+    def sweep(self):
+        """
+        Removes abandoned multipart uploads and returns the IDs of every Media row
+        still needing replication (pending or failed, plus older qualifying media).
+        """
+        Media = self.media_model
+        with self.app.app_context():
+            # Claims older than the timeout belong to a worker that died mid-upload
+            cutoff = datetime.datetime.now() - datetime.timedelta(seconds=self.claim_timeout)
+            reclaimed = self.db.session.execute(
+                self.db.update(Media)
+                .where(Media.replication_status == STATUS_IN_PROGRESS)
+                .where(Media.replication_started_at < cutoff)
+                .values(replication_status=STATUS_PENDING, replication_started_at=None)
+            ).rowcount
+            if reclaimed:
+                print(f"Reclaimed {reclaimed} stale in-progress replication(s).")
+
+            candidates = self.db.session.execute(
+                self.db.select(Media)
+                .where((Media.replication_status.is_(None)) |
+                       (Media.replication_status.in_([STATUS_PENDING, STATUS_FAILED])))
+            ).scalars().all()
+
+            media_ids = []
+            for media_obj in candidates:
+                if media_obj.replication_status is None:
+                    # Classify legacy rows once so later sweeps never stat them again
+                    if not needs_replication(self._local_path(media_obj), media_obj.is_video):
+                        media_obj.replication_status = STATUS_INLINE
+                        continue
+                    media_obj.replication_status = STATUS_PENDING
+                media_ids.append(media_obj.id)
+            self.db.session.commit()
+
+        # Checked after classification, so the error also lands on freshly backfilled rows
+        backend = self.get_backend()
+        if backend is None:
+            return []
+        removed = backend.cleanup_stale_uploads(REPLICATION_STALE_UPLOAD_SECONDS)
+        if removed:
+            print(f"Removed {removed} abandoned multipart upload(s).")
+
+        return media_ids
+
+    def replicate_pending(self):
+        """Runs one sweep and replicates everything it finds in the calling thread (used by `flask replicate`)."""
+        media_ids = self.sweep()
+        for media_id in media_ids:
+            with self.app.app_context():
+                self._replicate(media_id)
+        return len(media_ids)
+
+    def wait(self):
+        """Blocks until every queued item has been processed (useful for scripts/tests)."""
+        self._queue.join()
+
+    # --- Internals ---
+
+    @staticmethod
+    def _local_path(media_obj):
+        return os.path.join(UPLOAD_FOLDER, media_obj.media_path.split('/')[-1])
+
+    def _sweep_and_enqueue(self):
+        try:
+            media_ids = self.sweep()
+        except Exception as e:
+            print(f"Replication sweep failed: {e}")
+            return
+        if media_ids:
+            print(f"Queueing {len(media_ids)} media file(s) left over for replication.")
+            self.enqueue(media_ids)
+
+    def _run(self):
+        self._sweep_and_enqueue()
+        while True:
+            try:
+                media_id = self._queue.get(timeout=self.sweep_interval)
+            except queue.Empty:
+                # Idle for a full interval: retry failed rows and pick up anything missed
+                self._sweep_and_enqueue()
+                continue
+
+            with self._lock:
+                self._queued_ids.discard(media_id)
+            try:
+                with self.app.app_context():
+                    self._replicate(media_id)
+            except Exception as e:
+                print(f"Replication worker error for media {media_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _claim(self, media_id):
+        """Marks the row in_progress if nobody else has; returns the claim time, or None if it wasn't ours."""
+        Media = self.media_model
+        claimed_at = datetime.datetime.now()
+        result = self.db.session.execute(
+            self.db.update(Media)
+            .where(Media.id == media_id)
+            .where(Media.replication_status.in_(CLAIMABLE_STATUSES))
+            .values(replication_status=STATUS_IN_PROGRESS, replication_started_at=claimed_at)
+        )
+        self.db.session.commit()
+        return claimed_at if result.rowcount == 1 else None
+
+    def _finish(self, media_id, claimed_at, **values):
+        """Records the outcome, unless the claim was reclaimed as stale in the meantime."""
+        Media = self.media_model
+        result = self.db.session.execute(
+            self.db.update(Media)
+            .where(Media.id == media_id)
+            .where(Media.replication_status == STATUS_IN_PROGRESS)
+            .where(Media.replication_started_at == claimed_at)
+            .values(**values)
+        )
+        self.db.session.commit()
+        if result.rowcount != 1:
+            print(f"Replication claim on media {media_id} was lost; leaving its state to the new owner.")
+        return result.rowcount == 1
+
+    def _replicate(self, media_id):
+        # A misconfigured backend isn't the file's fault: record it without claiming or using up attempts
+        backend = self.get_backend()
+        if backend is None:
+            return
+
+        claimed_at = self._claim(media_id)
+        if claimed_at is None:
+            # Already replicated, or another worker is on it
+            return
+
+        media_obj = self.db.session.get(self.media_model, media_id)
+
+        local_path = self._local_path(media_obj)
+        key = os.path.basename(local_path)
+        attempts = media_obj.replication_attempts or 0
+
+        # A missing source is permanent; don't spend retries (or queue time) on it
+        if not os.path.isfile(local_path):
+            self._finish(media_id, claimed_at,
+                         replication_status=STATUS_MISSING,
+                         replication_error=f"Source file not found: {local_path}")
+            return
+
+        checksum = None
+        last_error = None
+        for attempt in range(1, self.max_attempts + 1):
+            if attempts >= self.attempt_limit:
+                break
+            attempts += 1
+            try:
+                checksum = upload_file(backend, local_path, key)
+                break
+            except FileNotFoundError as e:
+                # Deleted while we were copying it
+                self._finish(media_id, claimed_at,
+                             replication_status=STATUS_MISSING,
+                             replication_attempts=attempts,
+                             replication_error=str(e)[:500])
+                return
+            except Exception as e:
+                last_error = e
+                print(f"Replication attempt {attempts}/{self.attempt_limit} failed for {key}: {e}")
+                if attempt < self.max_attempts and attempts < self.attempt_limit:
+                    # Exponential backoff so a brief outage doesn't burn every attempt at once
+                    time.sleep(self.retry_backoff * 2 ** (attempt - 1))
+
+        if checksum is None:
+            gave_up = attempts >= self.attempt_limit
+            if gave_up:
+                print(f"Giving up on {key} after {attempts} attempts.")
+            self._finish(media_id, claimed_at,
+                         replication_status=STATUS_ABANDONED if gave_up else STATUS_FAILED,
+                         replication_attempts=attempts,
+                         replication_error=str(last_error)[:500] if last_error else media_obj.replication_error)
+            return
+
+        if self._finish(media_id, claimed_at,
+                        replication_status=STATUS_REPLICATED,
+                        storage_key=key,
+                        checksum_sha256=checksum,
+                        replicated_at=datetime.datetime.now(),
+                        replication_attempts=attempts,
+                        replication_error=None):
+            print(f"Replicated {key} to storage (sha256 {checksum[:12]}...)")
@@ -0,0 +1,207 @@
+import os
+import time
+import uuid
+import shutil
+import hashlib
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+
+from config import (
+    STORAGE_BACKEND,
+    STORAGE_LOCAL_DIR,
+    STORAGE_PUBLIC_BASE_URL,
+    REPLICATION_PART_SIZE_BYTES,
+    REPLICATION_MAX_CONCURRENCY
+)
+
+
+class StorageError(Exception):
+    """Raised when an object could not be written to (or verified in) the storage backend."""
+
+
+# --- Backend Interface ---
+
+class StorageBackend(ABC):
+    """
+    Minimal object-store interface modelled on S3-style multipart uploads.
+    New backends (S3, GCS, Drive...) must implement every abstract method.
+    """
+
+    @abstractmethod
+    def create_multipart_upload(self, key):
+        ...
+
+    @abstractmethod
+    def upload_part(self, upload_id, part_number, data):
+        """Stores one part and returns its MD5 hex digest (the part's 'ETag')."""
+
+    @abstractmethod
+    def complete_multipart_upload(self, upload_id, key, parts):
+        """Assembles the parts ([(part_number, md5), ...]) into the final object."""
+
+    @abstractmethod
+    def abort_multipart_upload(self, upload_id):
+        ...
+
+    @abstractmethod
+    def exists(self, key):
+        ...
+
+    @abstractmethod
+    def checksum(self, key):
+        """Returns the SHA-256 hex digest of a stored object, or None if it is missing."""
+
+    @abstractmethod
+    def public_url(self, key):
+        """Returns the link to the object in this store (never another store's URL)."""
+
+    def cleanup_stale_uploads(self, max_age_seconds):
+        """Discards multipart uploads abandoned by a crashed process. Optional for remote stores."""
+        return 0
+
+
+class LocalDirectoryBackend(StorageBackend):
+    """
+    Stand-in object store that keeps objects in a local directory.
+    Objects are served over HTTP by the Flask '/storage/<key>' route (or any
+    static file server pointed at the same folder) under `base_url`.
+    """
+
+    def __init__(self, root_dir, base_url):
+        self.root_dir = root_dir
+        self.base_url = base_url or ''
+        self.staging_dir = os.path.join(root_dir, '.multipart')
+        os.makedirs(self.staging_dir, exist_ok=True)
+
+    def _object_path(self, key):
+        # Keys are flat filenames; reject anything that could escape the root folder
+        if not key or key != os.path.basename(key) or key.startswith('.'):
+            raise StorageError(f"Invalid object key: {key!r}")
+        return os.path.join(self.root_dir, key)
+
+    def create_multipart_upload(self, key):
+        self._object_path(key)
+        upload_id = uuid.uuid4().hex
+        os.makedirs(os.path.join(self.staging_dir, upload_id))
+        return upload_id
+
+    def upload_part(self, upload_id, part_number, data):
+        part_path = os.path.join(self.staging_dir, upload_id, f"{part_number:05d}.part")
+        with open(part_path, 'wb') as fp:
+            fp.write(data)
+        return hashlib.md5(data).hexdigest()
+
+    def complete_multipart_upload(self, upload_id, key, parts):
+        upload_dir = os.path.join(self.staging_dir, upload_id)
+        final_path = self._object_path(key)
+        temp_path = os.path.join(upload_dir, 'assembled')
+
+        with open(temp_path, 'wb') as out:
+            for part_number, expected_md5 in sorted(parts):
+                part_path = os.path.join(upload_dir, f"{part_number:05d}.part")
+                with open(part_path, 'rb') as fp:
+                    data = fp.read()
+                if hashlib.md5(data).hexdigest() != expected_md5:
+                    raise StorageError(f"Checksum mismatch on part {part_number} of {key}")
+                out.write(data)
+
+        # Atomic rename so a half-written object is never visible under its key
+        os.replace(temp_path, final_path)
+        shutil.rmtree(upload_dir, ignore_errors=True)
+
+    def abort_multipart_upload(self, upload_id):
+        shutil.rmtree(os.path.join(self.staging_dir, upload_id), ignore_errors=True)
+
+    def cleanup_stale_uploads(self, max_age_seconds):
+        # Part files are written into the upload's folder, so its mtime tracks the last activity
+        cutoff = time.time() - max_age_seconds
+        removed = 0
+        for upload_id in os.listdir(self.staging_dir):
+            upload_dir = os.path.join(self.staging_dir, upload_id)
+            if os.path.isdir(upload_dir) and os.path.getmtime(upload_dir) < cutoff:
+                shutil.rmtree(upload_dir, ignore_errors=True)
+                removed += 1
+        return removed
+
+    def exists(self, key):
+        try:
+            return os.path.isfile(self._object_path(key))
+        except StorageError:
+            return False
+
+    def checksum(self, key):
+        if not self.exists(key):
+            return None
+        return file_sha256(self._object_path(key))
+
+    def public_url(self, key):
+        return self.base_url + key
+
+
+# --- Backend Registry ---
+
+STORAGE_BACKENDS = {
+    'local': lambda: LocalDirectoryBackend(STORAGE_LOCAL_DIR, STORAGE_PUBLIC_BASE_URL),
+}
+
+def get_storage_backend(name=STORAGE_BACKEND):
+    """Builds the configured storage backend (see STORAGE_BACKEND in config.py)."""
+    try:
+        factory = STORAGE_BACKENDS[name]
+    except KeyError:
+        raise StorageError(f"Unknown storage backend: {name!r}")
+    return factory()
+
+
+# --- Upload Helpers ---
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """Streams a file through SHA-256 without loading it all into memory."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fp:
+        for chunk in iter(lambda: fp.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _read_part(path, offset, length):
+    with open(path, 'rb') as fp:
+        fp.seek(offset)
+        return fp.read(length)
+
+def upload_file(backend, local_path, key,
+                part_size=REPLICATION_PART_SIZE_BYTES,
+                max_concurrency=REPLICATION_MAX_CONCURRENCY):
+    """
+    Uploads a local file as a multipart object, sending parts concurrently.
+    Each part is checked against its MD5 on assembly, and the finished object is
+    verified end-to-end with SHA-256. Returns the SHA-256 hex digest.
+    """
+    file_size = os.path.getsize(local_path)
+    offsets = list(range(0, file_size, part_size)) or [0]
+    expected_sha256 = file_sha256(local_path)
+
+    def send_part(part_number, offset):
+        data = _read_part(local_path, offset, part_size)
+        local_md5 = hashlib.md5(data).hexdigest()
+        remote_md5 = backend.upload_part(upload_id, part_number, data)
+        if remote_md5 != local_md5:
+            raise StorageError(f"Part {part_number} of {key} was corrupted in transit")
+        return part_number, remote_md5
+
+    upload_id = backend.create_multipart_upload(key)
+    pool = ThreadPoolExecutor(max_workers=max_concurrency)
+    try:
+        futures = [pool.submit(send_part, n, offset) for n, offset in enumerate(offsets, start=1)]
+        parts = [f.result() for f in futures]
+        pool.shutdown()
+        backend.complete_multipart_upload(upload_id, key, parts)
+    except Exception:
+        # Drop parts that haven't started yet rather than sending them to an upload we're aborting
+        pool.shutdown(wait=True, cancel_futures=True)
+        backend.abort_multipart_upload(upload_id)
+        raise
+
+    if backend.checksum(key) != expected_sha256:
+        raise StorageError(f"Stored object {key} does not match the local file checksum")
+
+    return expected_sha256
@@ -0,0 +1,48 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Point the app at throwaway folders BEFORE config.py is imported
+TEST_ROOT = tempfile.mkdtemp(prefix='journal-tests-')
+os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(TEST_ROOT, 'test.db')
+os.environ['UPLOAD_FOLDER'] = os.path.join(TEST_ROOT, 'uploads')
+os.environ['STORAGE_LOCAL_DIR'] = os.path.join(TEST_ROOT, 'storage')
+os.environ['STORAGE_PUBLIC_BASE_URL'] = 'http://testserver/storage/'
+os.makedirs(os.environ['UPLOAD_FOLDER'], exist_ok=True)
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import app as flask_app, db, Entry, Media, replicator
+from storage import LocalDirectoryBackend
+from config import UPLOAD_FOLDER
+
+
+@pytest.fixture
+def app(monkeypatch):
+    # Keep the app's own background thread out of the tests; each test drives its worker directly
+    monkeypatch.setattr(replicator, 'start', lambda: None)
+    with flask_app.app_context():
+        db.drop_all()
+        db.create_all()
+    yield flask_app
+
+
+@pytest.fixture
+def backend(tmp_path):
+    return LocalDirectoryBackend(str(tmp_path / 'store'), 'http://testserver/storage/')
+
+
+@pytest.fixture
+def make_media(app):
+    """Creates an Entry with one Media row backed by a real file in UPLOAD_FOLDER."""
+    def _make_media(filename, size=1024, is_video=True, **fields):
+        with open(os.path.join(UPLOAD_FOLDER, filename), 'wb') as fp:
+            fp.write(os.urandom(size))
+        with app.app_context():
+            media_obj = Media(media_path=f"uploads/{filename}", is_video=is_video, **fields)
+            db.session.add(Entry(date='2026-10-18', title='Test', description='Test entry', media=[media_obj]))
+            db.session.commit()
+            return media_obj.id
+    return _make_media
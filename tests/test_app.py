@@ -0,0 +1,106 @@
+import io
+import os
+import sys
+import subprocess
+
+import pytest
+
+import replication
+from replication import STATUS_INLINE, STATUS_PENDING, STATUS_REPLICATED
+from storage import StorageError
+from conftest import TEST_ROOT, db, Media, replicator
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def test_storage_route_serves_local_backend_objects(app):
+    os.makedirs(os.environ['STORAGE_LOCAL_DIR'], exist_ok=True)
+    with open(os.path.join(os.environ['STORAGE_LOCAL_DIR'], 'served.mp4'), 'wb') as fp:
+        fp.write(b'video bytes')
+
+    response = app.test_client().get('/storage/served.mp4')
+
+    assert response.status_code == 200
+    assert response.data == b'video bytes'
+    assert app.test_client().get('/storage/absent.mp4').status_code == 404
+
+
+def test_storage_route_only_registered_for_local_backend():
+    # A fresh interpreter, since the route is decided when app.py is imported
+    env = dict(os.environ, STORAGE_BACKEND='s3')
+    env['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(TEST_ROOT, 'other-backend.db')
+    result = subprocess.run(
+        [sys.executable, '-c', "from app import app; print('stored_object' in app.view_functions)"],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip().splitlines()[-1] == 'False'
+
+
+def post_entry(app, filename, size):
+    return app.test_client().post('/new-entry', data={
+        'title': 'Test',
+        'description': 'Test entry',
+        'photos': (io.BytesIO(os.urandom(size)), filename),
+    }, content_type='multipart/form-data')
+
+
+@pytest.fixture
+def enqueued(monkeypatch):
+    calls = []
+    monkeypatch.setattr(replicator, 'enqueue', calls.append)
+    return calls
+
+
+def only_media(app):
+    with app.app_context():
+        return db.session.execute(db.select(Media)).scalar_one()
+
+
+def test_new_video_is_marked_pending_and_enqueued(app, enqueued):
+    assert post_entry(app, 'clip.mp4', 2048).status_code == 302
+
+    media_obj = only_media(app)
+    assert media_obj.replication_status == STATUS_PENDING
+    assert enqueued == [[media_obj.id]]
+
+
+def test_oversized_image_is_marked_pending_and_enqueued(app, enqueued, monkeypatch):
+    monkeypatch.setattr(replication, 'MAX_INLINE_IMAGE_SIZE_BYTES', 1024)
+
+    assert post_entry(app, 'huge.png', 4096).status_code == 302
+
+    media_obj = only_media(app)
+    assert media_obj.replication_status == STATUS_PENDING
+    assert enqueued == [[media_obj.id]]
+
+
+def test_small_image_is_left_inline(app, enqueued):
+    assert post_entry(app, 'small.png', 512).status_code == 302
+
+    assert only_media(app).replication_status == STATUS_INLINE
+    assert enqueued == []
+
+
+def test_replicate_command(app, make_media):
+    media_id = make_media('cron.mp4', replication_status=STATUS_PENDING)
+
+    result = app.test_cli_runner().invoke(args=['replicate'])
+
+    assert result.exit_code == 0
+    assert 'Processed 1 media file(s).' in result.output
+    with app.app_context():
+        assert db.session.get(Media, media_id).replication_status == STATUS_REPLICATED
+
+
+def test_replicate_command_reports_backend_errors(app, make_media, monkeypatch):
+    def broken_factory():
+        raise StorageError("Unknown storage backend: 'lcoal'")
+
+    make_media('cron.mp4', replication_status=STATUS_PENDING)
+    monkeypatch.setattr(replicator, 'backend_factory', broken_factory)
+    monkeypatch.setattr(replicator, '_backend', None)
+
+    result = app.test_cli_runner().invoke(args=['replicate'])
+
+    assert result.exit_code != 0
+    assert 'Unknown storage backend' in result.output
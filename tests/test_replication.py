@@ -0,0 +1,210 @@
+import os
+import datetime
+
+import pytest
+
+import replication
+from replication import (
+    ReplicationWorker,
+    STATUS_INLINE,
+    STATUS_PENDING,
+    STATUS_IN_PROGRESS,
+    STATUS_REPLICATED,
+    STATUS_FAILED,
+    STATUS_ABANDONED,
+    STATUS_MISSING
+)
+from storage import StorageError, LocalDirectoryBackend, file_sha256
+from conftest import db, Media, UPLOAD_FOLDER
+
+
+class UnreachableBackend(LocalDirectoryBackend):
+    def upload_part(self, upload_id, part_number, data):
+        raise ConnectionError('storage is down')
+
+
+def make_worker(app, backend, **kwargs):
+    kwargs.setdefault('retry_backoff', 0)
+    return ReplicationWorker(app, db, Media, backend_factory=lambda: backend, **kwargs)
+
+
+def test_replicate_success(app, backend, make_media):
+    media_id = make_media('20261018_clip.mp4', size=4096, replication_status=STATUS_PENDING)
+    worker = make_worker(app, backend)
+
+    with app.app_context():
+        worker._replicate(media_id)
+        media_obj = db.session.get(Media, media_id)
+
+        assert media_obj.replication_status == STATUS_REPLICATED
+        assert media_obj.storage_key == '20261018_clip.mp4'
+        assert media_obj.checksum_sha256 == file_sha256(os.path.join(UPLOAD_FOLDER, '20261018_clip.mp4'))
+        assert media_obj.replicated_at is not None
+        assert media_obj.replication_error is None
+    assert backend.exists('20261018_clip.mp4')
+
+
+def test_replicate_fails_after_retries_with_backoff(app, tmp_path, make_media, monkeypatch):
+    media_id = make_media('20261018_broken.mp4', replication_status=STATUS_PENDING)
+    delays = []
+    monkeypatch.setattr(replication.time, 'sleep', delays.append)
+    worker = make_worker(app, UnreachableBackend(str(tmp_path / 'store'), ''), max_attempts=3, retry_backoff=2)
+
+    with app.app_context():
+        worker._replicate(media_id)
+        media_obj = db.session.get(Media, media_id)
+
+        assert media_obj.replication_status == STATUS_FAILED
+        assert 'storage is down' in media_obj.replication_error
+        assert media_obj.storage_key is None
+        assert media_obj.replication_attempts == 3
+    assert delays == [2, 4]
+
+
+def test_attempt_limit_abandons_row(app, tmp_path, make_media, monkeypatch):
+    media_id = make_media('doomed.mp4', replication_status=STATUS_FAILED, replication_attempts=4)
+    delays = []
+    monkeypatch.setattr(replication.time, 'sleep', delays.append)
+    worker = make_worker(app, UnreachableBackend(str(tmp_path / 'store'), ''),
+                         max_attempts=3, attempt_limit=5, retry_backoff=1)
+
+    with app.app_context():
+        worker._replicate(media_id)
+        media_obj = db.session.get(Media, media_id)
+
+        assert media_obj.replication_status == STATUS_ABANDONED
+        assert media_obj.replication_attempts == 5
+    assert delays == []
+    assert worker.sweep() == []
+
+
+def test_missing_source_file_is_terminal(app, backend, make_media, monkeypatch):
+    media_id = make_media('deleted.mp4', replication_status=STATUS_PENDING)
+    os.remove(os.path.join(UPLOAD_FOLDER, 'deleted.mp4'))
+    monkeypatch.setattr(replication.time, 'sleep', lambda seconds: pytest.fail('slept on a missing file'))
+    worker = make_worker(app, backend)
+
+    with app.app_context():
+        worker._replicate(media_id)
+        media_obj = db.session.get(Media, media_id)
+
+        assert media_obj.replication_status == STATUS_MISSING
+        assert 'not found' in media_obj.replication_error
+    assert worker.sweep() == []
+
+
+def test_sweep_requeues_failed_and_backfills_old_media(app, backend, make_media):
+    failed_id = make_media('a.mp4', replication_status=STATUS_FAILED)
+    pending_id = make_media('b.mp4', replication_status=STATUS_PENDING)
+    old_video_id = make_media('c.mp4')
+    small_id = make_media('small.jpg', is_video=False)
+    make_media('done.mp4', replication_status=STATUS_REPLICATED)
+    stale = backend.create_multipart_upload('a.mp4')
+    os.utime(os.path.join(backend.staging_dir, stale), (0, 0))
+
+    worker = make_worker(app, backend)
+    assert sorted(worker.sweep()) == sorted([failed_id, pending_id, old_video_id])
+    assert os.listdir(backend.staging_dir) == []
+
+    with app.app_context():
+        assert db.session.get(Media, old_video_id).replication_status == STATUS_PENDING
+        assert db.session.get(Media, small_id).replication_status == STATUS_INLINE
+
+
+def test_sweep_classifies_small_images_only_once(app, backend, make_media, monkeypatch):
+    make_media('one.jpg', is_video=False)
+    make_media('two.jpg', is_video=False)
+    checked = []
+    real_needs_replication = replication.needs_replication
+    monkeypatch.setattr(replication, 'needs_replication',
+                        lambda path, is_video: checked.append(path) or real_needs_replication(path, is_video))
+
+    worker = make_worker(app, backend)
+    assert worker.sweep() == []
+    assert worker.sweep() == []
+    assert len(checked) == 2
+
+
+def test_row_claimed_by_another_worker_is_skipped(app, backend, make_media):
+    media_id = make_media('busy.mp4', replication_status=STATUS_PENDING)
+    other_worker = make_worker(app, backend)
+    worker = make_worker(app, backend)
+
+    with app.app_context():
+        assert other_worker._claim(media_id) is not None
+        worker._replicate(media_id)
+        assert db.session.get(Media, media_id).replication_status == STATUS_IN_PROGRESS
+    assert not backend.exists('busy.mp4')
+
+
+def test_sweep_reclaims_stale_in_progress_rows(app, backend, make_media):
+    long_ago = datetime.datetime.now() - datetime.timedelta(hours=3)
+    stale_id = make_media('stale.mp4', replication_status=STATUS_IN_PROGRESS, replication_started_at=long_ago)
+    make_media('active.mp4', replication_status=STATUS_IN_PROGRESS, replication_started_at=datetime.datetime.now())
+
+    assert make_worker(app, backend, claim_timeout=3600).sweep() == [stale_id]
+    with app.app_context():
+        assert db.session.get(Media, stale_id).replication_status == STATUS_PENDING
+
+
+def test_lost_claim_does_not_overwrite_new_owner(app, backend, make_media):
+    media_id = make_media('lost.mp4', replication_status=STATUS_PENDING)
+    worker = make_worker(app, backend)
+
+    with app.app_context():
+        claimed_at = worker._claim(media_id)
+        # The claim went stale and another worker took the row over
+        assert make_worker(app, backend, claim_timeout=-1).sweep() == [media_id]
+        assert worker._finish(media_id, claimed_at, replication_status=STATUS_REPLICATED) is False
+        assert db.session.get(Media, media_id).replication_status == STATUS_PENDING
+
+
+def test_replicate_pending_retries_failed_rows(app, backend, make_media):
+    media_id = make_media('retry.mp4', replication_status=STATUS_FAILED)
+
+    assert make_worker(app, backend).replicate_pending() == 1
+    with app.app_context():
+        assert db.session.get(Media, media_id).replication_status == STATUS_REPLICATED
+
+
+class CountingBackend(LocalDirectoryBackend):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.uploads = 0
+
+    def create_multipart_upload(self, key):
+        self.uploads += 1
+        return super().create_multipart_upload(key)
+
+
+def test_background_thread_sweeps_on_start(app, tmp_path, make_media):
+    media_id = make_media('leftover.mp4', replication_status=STATUS_PENDING)
+    backend = CountingBackend(str(tmp_path / 'store'), '')
+    worker = make_worker(app, backend)
+
+    worker.enqueue([media_id]) # duplicate of the startup sweep's entry, must not be processed twice
+    worker.wait()
+    worker._queue.join() # the startup sweep may enqueue after our item finished
+
+    with app.app_context():
+        assert db.session.get(Media, media_id).replication_status == STATUS_REPLICATED
+    assert backend.uploads == 1
+
+
+def test_broken_backend_is_recorded_on_waiting_rows(app, make_media):
+    def broken_factory():
+        raise StorageError("Unknown storage backend: 'lcoal'")
+
+    pending_id = make_media('waiting.mp4', replication_status=STATUS_PENDING)
+    legacy_id = make_media('legacy.mp4')
+    worker = ReplicationWorker(app, db, Media, backend_factory=broken_factory)
+
+    assert worker.sweep() == []
+    with app.app_context():
+        worker._replicate(pending_id)
+        for media_id in (pending_id, legacy_id):
+            media_obj = db.session.get(Media, media_id)
+            assert media_obj.replication_status == STATUS_PENDING
+            assert "Unknown storage backend: 'lcoal'" in media_obj.replication_error
+            assert media_obj.replication_attempts == 0
+    assert 'lcoal' in worker.backend_error
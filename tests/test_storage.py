@@ -0,0 +1,121 @@
+import os
+import time
+
+import pytest
+
+from storage import StorageBackend, StorageError, LocalDirectoryBackend, file_sha256, upload_file
+
+
+def write_file(path, size):
+    data = os.urandom(size)
+    with open(path, 'wb') as fp:
+        fp.write(data)
+    return data
+
+
+def test_multipart_upload_round_trip(backend, tmp_path):
+    src = tmp_path / 'clip.mp4'
+    data = write_file(src, 5 * 1024 + 7)
+
+    checksum = upload_file(backend, str(src), 'clip.mp4', part_size=1024, max_concurrency=4)
+
+    assert checksum == file_sha256(str(src))
+    assert backend.exists('clip.mp4')
+    with open(os.path.join(backend.root_dir, 'clip.mp4'), 'rb') as fp:
+        assert fp.read() == data
+    assert backend.public_url('clip.mp4') == 'http://testserver/storage/clip.mp4'
+    assert os.listdir(backend.staging_dir) == []
+
+
+def test_zero_byte_upload(backend, tmp_path):
+    src = tmp_path / 'empty.mov'
+    src.write_bytes(b'')
+
+    upload_file(backend, str(src), 'empty.mov', part_size=1024)
+
+    assert backend.exists('empty.mov')
+    assert os.path.getsize(os.path.join(backend.root_dir, 'empty.mov')) == 0
+
+
+class CorruptingBackend(LocalDirectoryBackend):
+    """Reports a wrong MD5 for part 2, as if it was corrupted in transit."""
+
+    def upload_part(self, upload_id, part_number, data):
+        md5 = super().upload_part(upload_id, part_number, data)
+        return '0' * 32 if part_number == 2 else md5
+
+
+class CorruptOnDiskBackend(LocalDirectoryBackend):
+    """Acknowledges part 2 correctly but stores damaged bytes, caught on assembly."""
+
+    def upload_part(self, upload_id, part_number, data):
+        md5 = super().upload_part(upload_id, part_number, data)
+        if part_number == 2:
+            super().upload_part(upload_id, part_number, b'x' + data[1:])
+        return md5
+
+
+@pytest.mark.parametrize('backend_cls', [CorruptingBackend, CorruptOnDiskBackend])
+def test_part_md5_mismatch_aborts_upload(backend_cls, tmp_path):
+    broken = backend_cls(str(tmp_path / 'store'), '')
+    src = tmp_path / 'clip.mp4'
+    write_file(src, 3 * 1024)
+
+    with pytest.raises(StorageError):
+        upload_file(broken, str(src), 'clip.mp4', part_size=1024)
+
+    assert not broken.exists('clip.mp4')
+    assert os.listdir(broken.staging_dir) == []
+
+
+class FailFirstPartBackend(LocalDirectoryBackend):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.sent_parts = []
+
+    def upload_part(self, upload_id, part_number, data):
+        if part_number == 1:
+            raise ConnectionError('connection reset')
+        # Slow parts keep the rest of the file queued while part 1's failure is handled
+        time.sleep(0.2)
+        self.sent_parts.append(part_number)
+        return super().upload_part(upload_id, part_number, data)
+
+
+def test_failed_part_cancels_queued_parts(tmp_path):
+    broken = FailFirstPartBackend(str(tmp_path / 'store'), '')
+    src = tmp_path / 'clip.mp4'
+    write_file(src, 50 * 1024)
+
+    with pytest.raises(ConnectionError):
+        upload_file(broken, str(src), 'clip.mp4', part_size=1024, max_concurrency=2)
+
+    # At most the two parts already running when part 1 failed; the other 47 stay queued and are dropped
+    assert len(broken.sent_parts) <= 2
+    assert not broken.exists('clip.mp4')
+    assert os.listdir(broken.staging_dir) == []
+
+
+def test_invalid_keys_are_rejected(backend):
+    for key in ('../escape.mp4', '.multipart', '', None):
+        assert not backend.exists(key)
+    with pytest.raises(StorageError):
+        backend.create_multipart_upload('../escape.mp4')
+
+
+def test_cleanup_stale_uploads(backend):
+    stale = backend.create_multipart_upload('old.mp4')
+    fresh = backend.create_multipart_upload('new.mp4')
+    os.utime(os.path.join(backend.staging_dir, stale), (0, 0))
+
+    assert backend.cleanup_stale_uploads(60) == 1
+    assert os.listdir(backend.staging_dir) == [fresh]
+
+
+def test_incomplete_backend_cannot_be_instantiated():
+    class HalfBackend(StorageBackend):
+        def exists(self, key):
+            return False
+
+    with pytest.raises(TypeError):
+        HalfBackend()
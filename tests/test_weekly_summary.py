@@ -0,0 +1,81 @@
+import os
+
+import pytest
+from flask import render_template
+
+from generate_weekly_summary import build_media_info
+from replication import STATUS_PENDING, STATUS_REPLICATED, STATUS_FAILED, STATUS_ABANDONED, STATUS_MISSING
+from conftest import db, Media
+
+
+def media_info_for(app, media_id, backend):
+    with app.app_context():
+        return build_media_info(db.session.get(Media, media_id), backend)
+
+
+@pytest.mark.parametrize('status', [STATUS_PENDING, STATUS_FAILED])
+def test_unreplicated_media_has_no_link(app, backend, make_media, status):
+    media_id = make_media('clip.mp4', replication_status=status)
+
+    info = media_info_for(app, media_id, backend)
+
+    assert info['is_external_link']
+    assert info['external_url'] is None
+    assert info['replication_status'] == status
+
+
+def test_replicated_media_links_to_the_store(app, backend, make_media):
+    media_id = make_media('clip.mp4', replication_status=STATUS_REPLICATED, storage_key='clip.mp4')
+    with open(os.path.join(backend.root_dir, 'clip.mp4'), 'wb') as fp:
+        fp.write(b'video')
+
+    info = media_info_for(app, media_id, backend)
+
+    assert info['external_url'] == 'http://testserver/storage/clip.mp4'
+
+
+def test_replicated_row_without_stored_object_has_no_link(app, backend, make_media):
+    media_id = make_media('gone.mp4', replication_status=STATUS_REPLICATED, storage_key='gone.mp4')
+
+    assert media_info_for(app, media_id, backend)['external_url'] is None
+
+
+def test_small_image_is_embedded(app, backend, make_media):
+    media_id = make_media('photo.jpg', is_video=False)
+
+    info = media_info_for(app, media_id, backend)
+
+    assert not info['is_external_link']
+    assert info['external_url'] is None
+
+
+def render_media(app, **media):
+    media = {'is_video': True, 'is_external_link': True, 'media_filename': 'clip.mp4', 'external_url': None, **media}
+    entries = [{'date': '2026-10-18', 'title': '', 'description': '', 'media_items': [media]}]
+    with app.app_context():
+        return render_template('weekly_email.html', entries=entries, start_date='a', end_date='b')
+
+
+def test_email_distinguishes_failed_from_syncing(app):
+    assert 'still syncing' in render_media(app, replication_status=STATUS_PENDING)
+
+    failed_html = render_media(app, replication_status=STATUS_FAILED)
+    assert 'will be retried' in failed_html
+    assert 'still syncing' not in failed_html
+
+
+def test_email_does_not_promise_retries_for_terminal_states(app):
+    abandoned_html = render_media(app, replication_status=STATUS_ABANDONED)
+    assert 'after repeated attempts' in abandoned_html
+    assert 'will be retried' not in abandoned_html
+
+    missing_html = render_media(app, replication_status=STATUS_MISSING)
+    assert 'missing from the journal' in missing_html
+    assert 'will be retried' not in missing_html
+
+
+def test_email_shows_backend_errors_on_waiting_media(app):
+    html = render_media(app, replication_status=STATUS_PENDING,
+                        replication_error="Storage backend unavailable: Unknown storage backend: 'lcoal'")
+    assert 'Unknown storage backend' in html
+    assert 'still syncing' not in html